@@ -3,37 +3,281 @@
 
 import os
 import json
+import shelve
+import hashlib
 import argparse
 from datetime import datetime
-from deepdiff import DeepDiff
 from dotenv import load_dotenv
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from openai import OpenAI
+from openapi_common import format_path, json_equal
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the stdlib parser is used without it
+    orjson = None
 
 load_dotenv()
 
 OPEN_API_KEY = os.getenv("OPEN_API_KEY")
 
+# shelve database mapping sha256(diff_text) to its OpenAI classification
+CLASSIFICATION_CACHE = os.getenv("CLASSIFICATION_CACHE", os.path.join("updates", ".openai_cache"))
+CACHEABLE_CLASSIFICATIONS = ("API Change", "Production Update")
+
+# Fields that only document the API, changing them alone is not an API change
+DOC_KEYS = {"description", "summary", "title", "example", "examples", "externalDocs"}
+
+# Top-level sections that make up the API contract.
+API_SECTIONS = {"paths", "components", "security"}
+
+# Upper bound on the diff text put in the OpenAI prompt, a sample of the
+# changes is enough to classify them and keeps latency and cost bounded
+PROMPT_DIFF_CHARS = 4000
+
+# Component sections whose changes affect the API contract.
+API_COMPONENTS = ("securitySchemes", "parameters", "responses")
+
+# (change_type, path, old_value, new_value), with the change types named after DeepDiff's.
+Change = Tuple[str, List[Any], Any, Any]
+
+def loads_json(data: bytes) -> Any:
+    """Parse a JSON document, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 def load_json_file(file_path: str) -> Optional[Dict[str, Any]]:
     try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        return loads_json(data)
     except Exception as e:
         print(f"Error loading {file_path}: {e}")
         return None
 
-def classify_changes(diff_text: str) -> str:
-    """Classify changes based on plain text differences.
+def _is_doc_key(parent: List[Any], key: Any) -> bool:
+    """Check if key is a documentation-only field of the object at parent."""
+    # A schema property may itself be called "description" or "example"
+    return key in DOC_KEYS and (not parent or parent[-1] != "properties")
+
+def is_doc_path(path: List[Any]) -> bool:
+    """Check if a change path points into a documentation-only field."""
+    # Pair each key with its parent key instead of slicing out every prefix
+    return any(
+        key in DOC_KEYS and parent != "properties"
+        for parent, key in zip([None, *path], path)
+    )
+
+def _diff_values(old: Any, new: Any, path: List[Any], changes: List[Change]) -> None:
+    """Record the differences between two JSON values, skipping equal subtrees.
+
+    >>> changes = []
+    >>> _diff_values({"default": 1}, {"default": True}, [], changes)
+    >>> changes
+    [('type_changes', ['default'], 1, True)]
+    """
+    if json_equal(old, new):
+        return
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                changes.append(("dictionary_item_removed", path + [key], old[key], None))
+        for key in new:
+            if key not in old:
+                changes.append(("dictionary_item_added", path + [key], None, new[key]))
+            elif _is_doc_key(path, key):
+                # Documentation and examples are reported as a whole, never walked
+                if not json_equal(old[key], new[key]):
+                    changes.append(("values_changed", path + [key], old[key], new[key]))
+            else:
+                _diff_values(old[key], new[key], path + [key], changes)
+    elif isinstance(old, list) and isinstance(new, list):
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            _diff_values(old_item, new_item, path + [index], changes)
+        for index in range(len(new), len(old)):
+            changes.append(("iterable_item_removed", path + [index], old[index], None))
+        for index in range(len(old), len(new)):
+            changes.append(("iterable_item_added", path + [index], None, new[index]))
+    elif type(old) is not type(new):
+        changes.append(("type_changes", path, old, new))
+    else:
+        changes.append(("values_changed", path, old, new))
+
+def diff_openapi(old_schema: Dict[str, Any], new_schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Diff two OpenAPI schemas section by section.
+
+    Endpoints are compared by key first and only the operations that differ are
+    descended into, so unchanged parts of large specs cost a single ``==``.
+
+    Returns:
+        Dict with the added/removed/modified ``endpoints``, the changes to each
+        of the API ``components``, the ``info`` changes, and every change found
+        (including those outside these sections) under ``changes``.
+    """
+    changes: List[Change] = []
+
+    # Identical specs are the common case for re-runs; a single comparison
+    # settles them without walking any section
+    if json_equal(old_schema, new_schema):
+        return {
+            "endpoints": {"added": [], "removed": [], "modified": []},
+            "components": {section: [] for section in API_COMPONENTS},
+            "info": [],
+            "changes": changes,
+        }
+
+    old_paths = old_schema.get("paths", {})
+    new_paths = new_schema.get("paths", {})
+    # Key views support set algebra in C, sorting keeps the report stable
+    old_keys = old_paths.keys()
+    new_keys = new_paths.keys()
+    endpoints = {
+        "added": sorted(new_keys - old_keys),
+        "removed": sorted(old_keys - new_keys),
+        "modified": sorted(
+            path for path in old_keys & new_keys
+            if not json_equal(old_paths[path], new_paths[path])
+        ),
+    }
+    for path in endpoints["removed"]:
+        changes.append(("dictionary_item_removed", ["paths", path], old_paths[path], None))
+    for path in endpoints["added"]:
+        changes.append(("dictionary_item_added", ["paths", path], None, new_paths[path]))
+    for path in endpoints["modified"]:
+        _diff_values(old_paths[path], new_paths[path], ["paths", path], changes)
+
+    old_components = old_schema.get("components", {})
+    new_components = new_schema.get("components", {})
+    components = {}
+    for section in API_COMPONENTS:
+        section_changes: List[Change] = []
+        _diff_values(
+            old_components.get(section, {}),
+            new_components.get(section, {}),
+            ["components", section],
+            section_changes,
+        )
+        components[section] = section_changes
+        changes.extend(section_changes)
+
+    info: List[Change] = []
+    _diff_values(old_schema.get("info", {}), new_schema.get("info", {}), ["info"], info)
+    changes.extend(info)
+
+    # Everything else (schemas, servers, tags, ...) only appears in the raw differences
+    _diff_values(
+        {k: v for k, v in old_components.items() if k not in API_COMPONENTS},
+        {k: v for k, v in new_components.items() if k not in API_COMPONENTS},
+        ["components"],
+        changes,
+    )
+    handled = ("paths", "components", "info")
+    _diff_values(
+        {k: v for k, v in old_schema.items() if k not in handled},
+        {k: v for k, v in new_schema.items() if k not in handled},
+        [],
+        changes,
+    )
+
+    return {
+        "endpoints": endpoints,
+        "components": components,
+        "info": info,
+        "changes": changes,
+    }
+
+def format_raw_diff(changes: List[Change]) -> str:
+    """Format changes as plain text, grouped by change type."""
+    grouped: Dict[str, List[str]] = {}
+    for change_type, path, _, new_value in changes:
+        value = "REMOVED" if change_type.endswith("_removed") else new_value
+        grouped.setdefault(change_type, []).append(f"  {format_path(path)} -> {value}")
+
+    lines = []
+    for change_type, entries in grouped.items():
+        lines.append(f"{change_type.upper()}:")
+        lines.extend(entries)
+    return "\n".join(lines)
+
+def _get_cached_classification(key: str) -> Optional[str]:
+    try:
+        with shelve.open(CLASSIFICATION_CACHE, flag='r') as cache:
+            return cache.get(key)
+    except Exception:
+        # A missing or unreadable cache is just a miss
+        return None
+
+def _cache_classification(key: str, classification: str) -> None:
+    try:
+        os.makedirs(os.path.dirname(CLASSIFICATION_CACHE) or ".", exist_ok=True)
+        with shelve.open(CLASSIFICATION_CACHE) as cache:
+            cache[key] = classification
+    except Exception as e:
+        print(f"Error caching classification: {e}")
+
+def classify_changes(diff: Dict[str, Any], diff_text: Optional[str] = None) -> str:
+    """Classify changes from the structured diff of two schemas.
     
+    Args:
+        diff: Result of diff_openapi
+        diff_text: The diff already formatted by format_raw_diff, if available.
+            It is only needed when OpenAI has to be asked.
+        
+    Returns:
+        Classification string: "API Change", "Production Update" or "No Changes"
+    """
+    changes = diff["changes"]
+    if not changes:
+        return "No Changes"
+
+    if diff["endpoints"]["added"] or diff["endpoints"]["removed"]:
+        return "API Change"
+
+    doc_only = False
+    for _, path, _, _ in changes:
+        if path and path[0] in API_SECTIONS:
+            if not is_doc_path(path):
+                return "API Change"
+            doc_only = True
+
+    # Only info, servers, tags and the like changed
+    if not doc_only:
+        return "Production Update"
+
+    # Documentation inside the API itself changed, let the model judge it
+    if diff_text is None:
+        diff_text = format_raw_diff(changes)
+    return _classify_with_openai(_truncate_for_prompt(diff_text, len(changes)))
+
+def _truncate_for_prompt(diff_text: str, change_count: int) -> str:
+    """Cut the diff down to PROMPT_DIFF_CHARS, noting how much is shown."""
+    if len(diff_text) <= PROMPT_DIFF_CHARS:
+        return diff_text
+
+    # Keep whole lines only
+    shown = diff_text[:PROMPT_DIFF_CHARS].rsplit("\n", 1)[0]
+    # Values may span several lines, only count the lines that start a change
+    shown_count = sum(1 for line in shown.splitlines() if line.startswith("  root["))
+    return f"[{change_count} total changes, showing first {shown_count}]\n{shown}"
+
+def _classify_with_openai(diff_text: str) -> str:
+    """Classify changes based on plain text differences using OpenAI.
+    
+    Results are cached by the hash of diff_text, so re-running on the same
+    changes does not call OpenAI again.
+
     Args:
         diff_text: Plain text containing the differences between schemas
         
     Returns:
         Classification string: "API Change" or "Production Update"
     """
-    # Check if there are any differences
-    if not diff_text.strip():
-        return "No Changes"
+    cache_key = hashlib.sha256(diff_text.encode()).hexdigest()
+    cached = _get_cached_classification(cache_key)
+    if cached is not None:
+        return cached
 
     client = OpenAI(api_key=OPEN_API_KEY)
 
@@ -65,48 +309,39 @@ Provide your classification in JSON format:
     try:
         # Call OpenAI API
         response = client.chat.completions.create(
-            model="gpt-4",
+            model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are an API change analyzer. Your task is to classify API changes."},
                 {"role": "user", "content": prompt}
             ],
-            max_tokens=10,
+            # JSON mode guarantees a parseable object; 20 tokens fit the longest answer
+            response_format={"type": "json_object"},
+            max_tokens=20,
         )
 
         # Parse the response
         result = json.loads(response.choices[0].message.content)
-        return result["classification"]
+        classification = result["classification"]
+
+        # Only keep well-formed answers, errors and fallbacks are retried next time
+        if classification in CACHEABLE_CLASSIFICATIONS:
+            _cache_classification(cache_key, classification)
+        return classification
 
-    except json.JSONDecodeError as e:
-        print(f"Error parsing OpenAI response: {e}")
-        return "Error"
     except Exception as e:
         print(f"Error in OpenAI classification: {e}")
-        # Fallback to basic classification based on text content
-
-        if "paths" in diff_text.lower() or "endpoint" in diff_text.lower():
-            return "API Change"
-        else:
-            return "Production Update"
+        # Only documentation changed, which the rules count as a production update
+        return "Production Update"
 
-def analyze_changes(old_schema: Dict[str, Any], new_schema: Dict[str, Any]) -> Dict[str, Any]:
+def analyze_changes(old_schema: Dict[str, Any], new_schema: Dict[str, Any]) -> Tuple[str, str]:
     try:
-        diff = DeepDiff(old_schema, new_schema, view='tree')
-        
-        # Convert diff to plain text format
-        diff_text = []
-        for change_type, changes in diff.items():
-            diff_text.append(f"{change_type.upper()}:")
-            for change in changes:
-                try:
-                    diff_text.append(f"  {change.path()} -> {getattr(change, 't2', 'REMOVED')}")
-                except Exception as e:
-                    diff_text.append(f"  Error processing change: {e}")
-        
-        diff_text = "\n".join(diff_text)
+        diff = diff_openapi(old_schema, new_schema)
+
+        # Convert diff to plain text format once, the report and the OpenAI
+        # prompt share it. Nothing to format when the specs are identical.
+        diff_text = format_raw_diff(diff["changes"]) if diff["changes"] else ""
 
-        # Get classification from OpenAI
-        classification = classify_changes(diff_text) 
+        classification = classify_changes(diff, diff_text)
 
         # Build Markdown content
         summary_lines = [
@@ -114,28 +349,32 @@ def analyze_changes(old_schema: Dict[str, Any], new_schema: Dict[str, Any]) -> D
         ]
         
         if classification != "No Changes":
-            if "paths" in diff:
+            endpoints = diff["endpoints"]
+            component_changes = [
+                format_path(path)
+                for section in ("parameters", "responses")
+                for _, path, _, _ in diff["components"][section]
+            ]
+            if any(endpoints.values()) or component_changes:
                 summary_lines.append("## API Changes")
-                paths_diff = diff.get("paths", {})
-                if "dictionary_item_added" in paths_diff:
-                    summary_lines.append(f"- **New endpoints:** {[p.path() for p in paths_diff['dictionary_item_added']]}")
-                if "dictionary_item_removed" in paths_diff:
-                    summary_lines.append(f"- **Removed endpoints:** {[p.path() for p in paths_diff['dictionary_item_removed']]}")
-                if "values_changed" in paths_diff:
-                    summary_lines.append(f"- **Modified endpoints:** {[p.path() for p in paths_diff['values_changed']]}")
+                if endpoints["added"]:
+                    summary_lines.append(f"- **New endpoints:** {endpoints['added']}")
+                if endpoints["removed"]:
+                    summary_lines.append(f"- **Removed endpoints:** {endpoints['removed']}")
+                if endpoints["modified"]:
+                    summary_lines.append(f"- **Modified endpoints:** {endpoints['modified']}")
+                if component_changes:
+                    summary_lines.append(f"- **Component changes:** {component_changes}")
             
-            if "components" in diff:
+            sec_diff = diff["components"]["securitySchemes"]
+            if sec_diff:
                 summary_lines.append("## Security Changes")
-                sec_diff = diff.get("components", {}).get("securitySchemes", {})
-                if sec_diff:
-                    summary_lines.append(f"- **Security scheme changes:** {sec_diff}")
+                summary_lines.append(f"- **Security scheme changes:** {[format_path(path) for _, path, _, _ in sec_diff]}")
             
-            if "info" in diff:
+            if diff["info"]:
                 summary_lines.append("## Documentation Changes")
-                info_diff = diff.get("info", {})
-                if "values_changed" in info_diff:
-                    for change in info_diff["values_changed"]:
-                        summary_lines.append(f"- **{change.path()}:** {change.t1} -> {change.t2}")
+                for _, path, old_value, new_value in diff["info"]:
+                    summary_lines.append(f"- **{format_path(path)}:** {old_value} -> {new_value}")
 
         summary_lines.append("\n---\n## Raw Differences\n")
         summary_lines.append("```diff")
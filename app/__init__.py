@@ -1,10 +1,12 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from .routes import router
 
 app = FastAPI(
     title="OpenAPI Comparison Service",
     description="Service for comparing OpenAPI specifications between different commits",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 app.include_router(router, prefix="/api/v1") 
\ No newline at end of file
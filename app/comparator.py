@@ -1,16 +1,18 @@
 import subprocess
 import os
-import json
 from datetime import datetime
-from typing import Optional, Tuple
+from pathlib import Path
+from typing import List, Optional, Tuple
 from .models import ComparisonResult
-from deepdiff import DeepDiff
+from analyze_openapi_changes import analyze_changes, loads_json
 
 class OpenAPIComparator:
-    def __init__(self, script_path: str = "./compare_openapi.sh"):
-        self.script_path = script_path
+    def __init__(self, spec_path: str = "openapi.json"):
+        self.spec_path = spec_path
         self.updates_dir = "updates"
         os.makedirs(self.updates_dir, exist_ok=True)
+        # Created once above, so reports are written without re-checking it
+        self._updates_path = Path(self.updates_dir)
 
     def compare_commits(
         self, 
@@ -32,25 +34,19 @@ class OpenAPIComparator:
             ComparisonResult containing diff content
         """
         try:
-            # Run the comparison script
-            result = subprocess.run(
-                [self.script_path, repo_path, old_commit, new_commit, repo_name],
-                capture_output=True,
-                text=True
+            # Read both specs straight from git and diff them in-process, so
+            # each spec is parsed and diffed exactly once
+            old_schema, new_schema = self._load_commit_schemas(
+                repo_path, old_commit, new_commit
             )
-            
-            if result.returncode != 0:
-                raise Exception(f"Script failed: {result.stderr}")
-            
-            # Get the output file
+
+            classification, diff_content = analyze_changes(old_schema, new_schema)
+            if classification == "Error":
+                raise Exception(diff_content)
+
             current_date = datetime.now().strftime('%Y-%m-%d')
-            diff_file = f"{self.updates_dir}/{repo_name}-{current_date}-open-api-diff.md"
-            
-            # Read the diff content if file exists
-            diff_content = ""
-            if os.path.exists(diff_file):
-                with open(diff_file, 'r') as f:
-                    diff_content = f.read()
+            diff_file = self._updates_path / f"{repo_name}-{current_date}-open-api-diff.md"
+            diff_file.write_text(diff_content)
             
             return ComparisonResult(
                 diff_content=diff_content,
@@ -62,73 +58,35 @@ class OpenAPIComparator:
         except Exception as e:
             raise Exception(f"Comparison failed: {str(e)}")
 
-    def _generate_categorized_diff(self, old_file: str, new_file: str) -> str:
-        """Generate a categorized diff of OpenAPI specs."""
-        with open(old_file) as f1, open(new_file) as f2:
-            old = json.load(f1)
-            new = json.load(f2)
-
-        diff = DeepDiff(old, new, view='tree')
-        
-        if not diff:
-            return "# No Changes\nNo differences found in OpenAPI specs."
+    def _load_commit_schemas(self, repo_path: str, *commits: str) -> List[dict]:
+        """Read and parse the OpenAPI spec as of each commit with one git process."""
+        objects = [f"{commit}:{self.spec_path}" for commit in commits]
+        result = subprocess.run(
+            ["git", "-C", repo_path, "cat-file", "--batch"],
+            input="".join(f"{obj}\n" for obj in objects).encode(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
         
-        # Initialize categories
-        categories = {
-            "API Changes": [],
-            "Production Changes": []
-        }
+        if result.returncode != 0:
+            stderr = result.stderr.decode('utf-8', errors='replace')
+            raise Exception(f"git cat-file failed: {stderr}")
         
-        # Categorize changes
-        for change_type, changes in diff.items():
-            for change in changes:
-                path = change.path()
-                old_val = self._get_by_path(old, change.path(output_format='list'))
-                new_val = self._get_by_path(new, change.path(output_format='list'))
-                
-                # Determine category
-                if self._is_api_change(path, old_val, new_val):
-                    categories["API Changes"].append(
-                        f"### {path}\n"
-                        f"**Old:**\n```json\n{json.dumps(old_val, indent=2)}\n```\n"
-                        f"**New:**\n```json\n{json.dumps(new_val, indent=2)}\n```\n"
-                    )
-                else:
-                    categories["Production Changes"].append(
-                        f"### {path}\n"
-                        f"**Old:**\n```json\n{json.dumps(old_val, indent=2)}\n```\n"
-                        f"**New:**\n```json\n{json.dumps(new_val, indent=2)}\n```\n"
-                    )
-        
-        # Generate markdown content
-        content = ["# OpenAPI Specification Changes\n"]
-        
-        for category, changes in categories.items():
-            if changes:
-                content.append(f"## {category}\n")
-                content.extend(changes)
-        
-        return "\n".join(content)
-
-    def _is_api_change(self, path: str, old_val: any, new_val: any) -> bool:
-        """Determine if a change is an API change or production change."""
-        api_paths = [
-            "paths",
-            "components.schemas",
-            "components.securitySchemes",
-            "components.parameters",
-            "components.responses"
-        ]
+        # Each object comes back as "<sha> <type> <size>\n<content>\n", or as
+        # "<name> missing\n" when the commit or the file does not exist
+        out = result.stdout
+        schemas = []
+        pos = 0
+        for obj in objects:
+            eol = out.index(b"\n", pos)
+            header = out[pos:eol]
+            if header.endswith((b" missing", b" ambiguous")):
+                raise Exception(f"{obj} not found in {repo_path}")
+            
+            size = int(header.rsplit(b" ", 1)[1])
+            start = eol + 1
+            # Hand the raw bytes to the parser instead of decoding them to str first
+            schemas.append(loads_json(out[start:start + size]))
+            pos = start + size + 1
         
-        return any(api_path in path for api_path in api_paths)
-
-    def _get_by_path(self, data: dict, path_list: list) -> any:
-        """Get value from nested dictionary using path list."""
-        for key in path_list:
-            if isinstance(data, dict):
-                data = data.get(key)
-            elif isinstance(data, list) and isinstance(key, int):
-                data = data[key]
-            else:
-                return None
-        return data 
\ No newline at end of file
+        return schemas
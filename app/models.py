@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 from datetime import datetime
 
@@ -12,11 +12,13 @@ class ComparisonResponse(BaseModel):
     status: str
     message: str
     diff_file: Optional[str] = None
-    timestamp: datetime = datetime.now()
+    timestamp: datetime = Field(default_factory=datetime.now)
 
 class ComparisonResult(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     diff_content: str
     repo_name: str
     old_commit: str
     new_commit: str
-    timestamp: datetime = datetime.now() 
\ No newline at end of file
+    timestamp: datetime = Field(default_factory=datetime.now)
\ No newline at end of file
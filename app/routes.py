@@ -1,17 +1,22 @@
 from fastapi import APIRouter, HTTPException
 from .models import ComparisonRequest, ComparisonResponse
 from .comparator import OpenAPIComparator
+from pathlib import Path
 import os
 
 router = APIRouter()
 comparator = OpenAPIComparator()
 
 @router.post("/compare", response_model=ComparisonResponse)
-async def compare_commits(request: ComparisonRequest):
-    """Compare OpenAPI specs between two commits."""
+def compare_commits(request: ComparisonRequest):
+    """Compare OpenAPI specs between two commits.
+
+    Declared sync on purpose: the comparison blocks on git and file I/O, and
+    FastAPI runs sync handlers in its thread pool instead of the event loop.
+    """
     try:
         # Validate repository path
-        if not os.path.exists(request.repo_path):
+        if not Path(request.repo_path).is_dir():
             raise HTTPException(status_code=400, detail="Repository path does not exist")
         
         # Use repo_name from request or default to directory name
@@ -51,65 +51,7 @@ fetch_openapi_json "$NEW_VERSION" "$NEW_FILE"
 git checkout -  # Return to original branch
 
 echo "Running structured JSON diff..."
-
-python3 - << 'EOF'
-import json
-from deepdiff import DeepDiff
-
-with open("openapi_old.json") as f1, open("openapi_new.json") as f2:
-    old = json.load(f1)
-    new = json.load(f2)
-
-diff = DeepDiff(old, new, view='tree')
-
-if not diff:
-    print("✅ No differences found in OpenAPI specs.")
-else:
-    print("🔍 Differences found:\n")
-    for change_type, changes in diff.items():
-        print(f"{change_type.upper()}:")
-        for change in changes:
-            try:
-                print(f"  {change.path()} -> {getattr(change, 't2', 'REMOVED')}")
-            except Exception as e:
-                print(f"  Error processing change: {e}")
-EOF
-
-python3 - << 'EOF' > openapi_diff.txt
-import json
-from deepdiff import DeepDiff
-
-with open("openapi_old.json") as f1, open("openapi_new.json") as f2:
-    old = json.load(f1)
-    new = json.load(f2)
-
-diff = DeepDiff(old, new, view='tree')
-
-def get_by_path(data, path_list):
-    for key in path_list:
-        if isinstance(data, dict):
-            data = data.get(key)
-        elif isinstance(data, list) and isinstance(key, int):
-            data = data[key]
-        else:
-            return None
-    return data
-
-if not diff:
-    print("✅ No differences found in OpenAPI specs.")
-else:
-    print("🔍 Detailed Differences:\n")
-    for change_type, changes in diff.items():
-        print(f"{change_type.upper()}:")
-        for change in changes:
-            path_str = change.path()
-            path_parts = change.path(output_format='list')
-            old_val = get_by_path(old, path_parts)
-            new_val = get_by_path(new, path_parts)
-            print(f"\n{path_str}:")
-            print(f"  OLD: {json.dumps(old_val, indent=2)}")
-            print(f"  NEW: {json.dumps(new_val, indent=2)}")
-EOF
+python3 openapi_diff.py "$OLD_FILE" "$NEW_FILE" --output openapi_diff.txt
 
 echo "Running OpenAPI schema analysis..."
 python3 analyze_openapi_changes.py "$OLD_FILE" "$NEW_FILE" --output-dir "$OUTPUT_DIR" --repo-name "$REPO_NAME" --date "$LATEST_COMMIT_DATE"
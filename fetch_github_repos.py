@@ -1,8 +1,39 @@
 #!/usr/bin/env python3
+import argparse
+import asyncio
+import atexit
+import io
 import json
 import os
+import re
+import shutil
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Only the fields this script uses, 100 repositories per page. Like gh repo
+# list, only repositories the owner owns are listed, not ones it collaborates on
+REPOS_QUERY = """
+query($owner: String!, $endCursor: String) {
+  repositoryOwner(login: $owner) {
+    repositories(first: 100, after: $endCursor, ownerAffiliations: OWNER) {
+      nodes { name url sshUrl isPrivate pushedAt }
+      pageInfo { hasNextPage endCursor }
+    }
+  }
+}
+"""
+
+# How long a cached repository listing is reused, in seconds
+DEFAULT_CACHE_TTL = 600
+
+# Clones and fetches mostly wait on the network, so run several per core
+DEFAULT_JOBS = min(16, (os.cpu_count() or 4) * 4)
 
 
 # ANSI color codes
@@ -18,96 +49,181 @@ class Colors:
     UNDERLINE = "\033[4m"
 
 
+# Escape codes are only noise in pipes and log files, and NO_COLOR
+# (https://no-color.org) turns them off everywhere
+_USE_COLOR = sys.stdout.isatty() and not os.environ.get("NO_COLOR")
+
+if not _USE_COLOR:
+    for _name in [name for name in vars(Colors) if name.isupper()]:
+        setattr(Colors, _name, "")
+
+
+class Console:
+    """Buffered writer for all output of this script.
+
+    Messages are collected under a lock and written to stdout in chunks of
+    about FLUSH_SIZE characters. On a terminal every message is written
+    straight away, so progress stays visible.
+    """
+
+    FLUSH_SIZE = 4096
+
+    def __init__(self, stream=None):
+        self._stream = stream or sys.stdout
+        self._lock = threading.Lock()
+        self._buf = io.StringIO()
+        self._autoflush = self._stream.isatty()
+
+    def write(self, text):
+        with self._lock:
+            self._buf.write(text)
+            if self._autoflush or self._buf.tell() > self.FLUSH_SIZE:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        data = self._buf.getvalue()
+        if data:
+            self._stream.write(data)
+            self._stream.flush()
+            self._buf.seek(0)
+            self._buf.truncate()
+
+
+console = Console()
+atexit.register(console.flush)
+
+
+# Message prefixes and the line ending, built once instead of per message
+_SECTION_PREFIX = f"\n{Colors.BLUE}{Colors.BOLD}▶ "
+_SUCCESS_PREFIX = f"{Colors.GREEN}✓ "
+_WARNING_PREFIX = f"{Colors.WARNING}⚠ "
+_ERROR_PREFIX = f"{Colors.FAIL}✗ "
+_INFO_PREFIX = f"{Colors.CYAN}ℹ "
+_LINE_END = f"{Colors.ENDC}\n"
+
+
 def print_header(text):
     """Print a formatted header."""
-    print(f"\n{Colors.HEADER}{Colors.BOLD}{'=' * 50}{Colors.ENDC}")
-    print(f"{Colors.HEADER}{Colors.BOLD}  {text}{Colors.ENDC}")
-    print(f"{Colors.HEADER}{Colors.BOLD}{'=' * 50}{Colors.ENDC}\n")
+    line = f"{Colors.HEADER}{Colors.BOLD}{'=' * 50}{Colors.ENDC}"
+    title = f"{Colors.HEADER}{Colors.BOLD}  {text}{Colors.ENDC}"
+    console.write(f"\n{line}\n{title}\n{line}\n\n")
+    console.flush()
 
 
 def print_section(text):
     """Print a formatted section header."""
-    print(f"\n{Colors.BLUE}{Colors.BOLD}▶ {text}{Colors.ENDC}")
+    console.write(_SECTION_PREFIX + text + _LINE_END)
+    console.flush()
 
 
 def print_success(text):
     """Print a success message."""
-    print(f"{Colors.GREEN}✓ {text}{Colors.ENDC}")
+    console.write(_SUCCESS_PREFIX + text + _LINE_END)
 
 
 def print_warning(text):
     """Print a warning message."""
-    print(f"{Colors.WARNING}⚠ {text}{Colors.ENDC}")
+    console.write(_WARNING_PREFIX + text + _LINE_END)
 
 
 def print_error(text):
     """Print an error message."""
-    print(f"{Colors.FAIL}✗ {text}{Colors.ENDC}")
+    console.write(_ERROR_PREFIX + text + _LINE_END)
 
 
 def print_info(text):
     """Print an info message."""
-    print(f"{Colors.CYAN}ℹ {text}{Colors.ENDC}")
+    console.write(_INFO_PREFIX + text + _LINE_END)
 
 
-def get_all_repos(org):
-    """Fetch all repositories for a given GitHub organization using GitHub CLI."""
-    try:
-        # Check if GitHub CLI is installed
-        subprocess.run(
-            ["gh", "--version"],
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-    except (subprocess.SubprocessError, FileNotFoundError):
+def _repos_cache_path(org):
+    """Path of the cached repository listing for an organization."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "meeting-baas" / "repos" / f"{org}.json"
+
+
+def get_all_repos(org, cache_ttl=DEFAULT_CACHE_TTL, use_cache=True):
+    """Fetch all repositories for a given GitHub organization using GitHub CLI.
+
+    The listing is cached on disk and reused for `cache_ttl` seconds, so
+    repeated runs skip the GitHub API. With `use_cache` off it is always
+    fetched, and the cache refreshed.
+
+    Returns:
+        Tuple of (repositories, whether they were served from the cache).
+    """
+    cache_path = _repos_cache_path(org)
+    if use_cache:
+        try:
+            if time.time() - cache_path.stat().st_mtime < cache_ttl:
+                print_info(f"Using cached repository list for organization: {org}")
+                return json.loads(cache_path.read_text()), True
+        except (OSError, ValueError):
+            # No usable cache, fetch from GitHub
+            pass
+
+    # Check if GitHub CLI is installed. A PATH lookup is enough, a missing
+    # login is reported by the API call itself.
+    if shutil.which("gh") is None:
         print_error("GitHub CLI (gh) is not installed or not in PATH.")
         print_info("Please install it from: https://cli.github.com/")
         sys.exit(1)
 
-    # Check if user is authenticated
-    try:
-        subprocess.run(
-            ["gh", "auth", "status"],
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-    except subprocess.CalledProcessError:
+    print_info(f"Fetching repositories for organization: {org}")
+
+    # Fetch all repos for the organization. gh pages through the GraphQL API
+    # and --jq prints one repository per line, so they are parsed as they
+    # arrive instead of buffering the whole listing.
+    command = [
+        "gh",
+        "api",
+        "graphql",
+        "--paginate",
+        "-f",
+        f"owner={org}",
+        "-f",
+        f"query={REPOS_QUERY}",
+        "--jq",
+        ".data.repositoryOwner.repositories.nodes[]",
+    ]
+    # stderr goes to a file: a second pipe could fill up while stdout is
+    # read to the end, and leave both processes blocked
+    with tempfile.TemporaryFile() as err, subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=err, text=True
+    ) as proc:
+        repos = [json.loads(line) for line in proc.stdout if line.strip()]
+        proc.wait()
+        err.seek(0)
+        stderr = err.read().decode(errors="replace")
+
+    if proc.returncode != 0 and "gh auth login" in stderr:
         print_error("Not authenticated with GitHub CLI.")
         print_info("Please run 'gh auth login' to authenticate.")
         sys.exit(1)
 
-    print_info(f"Fetching repositories for organization: {org}")
+    if proc.returncode != 0:
+        print_error(f"Error fetching repositories: exit status {proc.returncode}")
+        print_error(f"Error details: {stderr}")
+        sys.exit(1)
 
-    # Fetch all repos for the organization
-    try:
-        result = subprocess.run(
-            [
-                "gh",
-                "repo",
-                "list",
-                org,
-                "--limit",
-                "1000",
-                "--json",
-                "name,url,sshUrl,isPrivate",
-            ],
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-        repos = json.loads(result.stdout)
+    if not repos:
+        print_warning(f"No repositories found for organization: {org}")
+        return [], False
 
-        if not repos:
-            print_warning(f"No repositories found for organization: {org}")
-            return []
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so a concurrent run never reads a partial file
+        tmp_path = cache_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(repos))
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print_warning(f"Could not cache repository list: {e}")
 
-        return repos
-    except subprocess.CalledProcessError as e:
-        print_error(f"Error fetching repositories: {e}")
-        print_error(f"Error details: {e.stderr}")
-        sys.exit(1)
+    return repos, False
 
 
 def filter_repos_by_visibility(repos, visibility):
@@ -117,157 +233,254 @@ def filter_repos_by_visibility(repos, visibility):
 
     # return [repo for repo in repos if repo["visibility"].lower() == visibility.lower()]
 
-    if visibility.lower() == "all":
+    visibility = visibility.lower()
+    if visibility == "all":
         return repos
-    is_private = visibility.lower() == "private"
+    is_private = visibility == "private"
     return [repo for repo in repos if repo.get("isPrivate") == is_private]
 
 
 
 def is_git_repository(path):
     """Check if the specified path is a git repository."""
-    git_dir = os.path.join(path, ".git")
-    return os.path.exists(git_dir) and os.path.isdir(git_dir)
+    return os.path.isdir(os.path.join(path, ".git"))
+
+
+async def _run_git(*args, capture=False):
+    """Run a git command without blocking the event loop.
 
+    stderr is always kept for error messages, stdout only with `capture`.
 
-def get_repo_remote_url(repo_path):
+    Returns:
+        The decoded stdout, or "" when it is not captured.
+
+    Raises:
+        subprocess.CalledProcessError: If git exits with a non-zero status.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "git",
+        *args,
+        stdout=asyncio.subprocess.PIPE if capture else asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, args, stdout, stderr)
+    return stdout.decode() if capture else ""
+
+
+async def get_repo_remote_url(repo_path):
     """Get the remote URL of a repository."""
     try:
-        result = subprocess.run(
-            ["git", "-C", repo_path, "remote", "get-url", "origin"],
-            check=True,
-            capture_output=True,
-            text=True,
+        output = await _run_git(
+            "-C", repo_path, "remote", "get-url", "origin", capture=True
         )
-        return result.stdout.strip()
+        return output.strip()
     except subprocess.CalledProcessError:
         return None
 
 
-def update_repository(repo_path):
-    """Update an existing repository by fetching the latest changes without merging."""
-    print_info(f"Updating repository: {os.path.basename(repo_path)}")
+async def _repo_status(repo_path):
+    """Get how many upstream commits the current branch is missing.
+
+    A single for-each-ref reports it, instead of separate rev-parse and
+    rev-list calls.
+
+    Returns:
+        Number of commits behind upstream; 0 for a detached HEAD or a branch
+        without upstream.
+    """
+    output = await _run_git(
+        "-C",
+        repo_path,
+        "for-each-ref",
+        "--format=%(HEAD) %(upstream:track)",
+        "refs/heads",
+        capture=True,
+    )
+    for line in output.splitlines():
+        # The checked out branch is marked with "*", tracking looks like
+        # "[behind 3]" or "[ahead 1, behind 2]"
+        if line.startswith("*"):
+            behind = re.search(r"behind (\d+)", line)
+            return int(behind.group(1)) if behind else 0
+    return 0
+
+
+def _origin_updated_at(repo_path):
+    """Get when a remote-tracking branch of origin last changed, or None.
+
+    Fetches that bring nothing new leave the origin refs and their reflogs
+    untouched, unlike FETCH_HEAD, which every fetch of any remote rewrites.
+    """
+    git_dir = os.path.join(repo_path, ".git")
+    newest = None
+    # Loose refs go away when refs are packed, the reflogs stay
+    for top in ("logs/refs/remotes/origin", "refs/remotes/origin"):
+        for root, _, files in os.walk(os.path.join(git_dir, top)):
+            for file in files:
+                try:
+                    mtime = os.path.getmtime(os.path.join(root, file))
+                except OSError:
+                    continue
+                if newest is None or mtime > newest:
+                    newest = mtime
+    return newest
+
+
+def _fetched_since_push(repo_path, pushed_at):
+    """Check if origin's branches were updated after the repository's last push.
+
+    `pushed_at` is the ISO 8601 timestamp GitHub reports, or None when it is
+    unknown (e.g. a repository listing cached before it was queried).
+    """
+    if not pushed_at:
+        return False
+    updated = _origin_updated_at(repo_path)
+    if updated is None:
+        # No origin refs or reflogs to go by
+        return False
+    pushed = datetime.fromisoformat(pushed_at.replace("Z", "+00:00"))
+    return datetime.fromtimestamp(updated, tz=timezone.utc) > pushed
+
+
+async def update_repository(repo_path, pushed_at=None):
+    """Update an existing repository by fetching the latest changes without merging.
+
+    The fetch is skipped when nothing was pushed since the last one, see
+    `_fetched_since_push`.
+
+    Returns:
+        Tuple of (success, message describing the outcome).
+    """
+    name = os.path.basename(repo_path)
     try:
-        # Fetch the latest changes without merging
-        subprocess.run(
-            ["git", "-C", repo_path, "fetch", "--all"],
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
+        fetched = not _fetched_since_push(repo_path, pushed_at)
+        if fetched:
+            # Fetch the latest changes without merging. Only origin is
+            # fetched: it is the remote whose URL was matched, and the
+            # upstream that the status below compares against
+            await _run_git("-C", repo_path, "fetch", "origin")
+
+        commit_diff = await _repo_status(repo_path)
+
+        action = "Fetched" if fetched else "No new pushes for"
+        if commit_diff > 0:
+            return True, f"{action} {name} ({commit_diff} new commits available)"
+        return True, f"{action} {name} (already up to date)"
+    except subprocess.CalledProcessError as e:
+        # Handle the error message correctly based on whether it's bytes or string
+        error_msg = e.stderr if isinstance(e.stderr, str) else e.stderr.decode().strip()
+        return False, f"Failed to update {name}: {error_msg}"
 
-        # Get current branch
-        result = subprocess.run(
-            ["git", "-C", repo_path, "rev-parse", "--abbrev-ref", "HEAD"],
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-        current_branch = result.stdout.strip()
-
-        # Show commit difference information
-        result = subprocess.run(
-            [
-                "git",
-                "-C",
-                repo_path,
-                "rev-list",
-                "--count",
-                f"{current_branch}..origin/{current_branch}",
-            ],
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-        commit_diff = result.stdout.strip()
 
-        if commit_diff and int(commit_diff) > 0:
-            print_success(
-                f"Fetched {os.path.basename(repo_path)} ({commit_diff} new commits available)"
+async def _process_one_repo(repo, working_dir, use_ssh, fresh_listing):
+    """Clone or update a single repository.
+
+    Runs concurrently with the other repositories, so it reports back
+    instead of printing. The pushedAt of a cached listing can predate the
+    latest push, so fetches are only skipped with a `fresh_listing`.
+
+    Returns:
+        Tuple of (status, name, message) where status is one of
+        "new", "updated", "failed" or "skipped".
+    """
+    name = repo["name"]
+    # Choose between SSH and HTTPS URL
+    url = repo["sshUrl"] if use_ssh else repo["url"]
+    repo_path = os.path.join(working_dir, name)
+
+    if os.path.exists(repo_path):
+        if not is_git_repository(repo_path):
+            return (
+                "skipped",
+                name,
+                f"Skipping {name}: Directory exists but is not a git repository",
             )
-        else:
-            print_success(f"Fetched {os.path.basename(repo_path)} (already up to date)")
 
-        return True
+        remote_url = await get_repo_remote_url(repo_path)
+
+        # Check if the remote URL matches (ignoring .git suffix variations)
+        remote_base = remote_url.rstrip(".git") if remote_url else ""
+        url_base = url.rstrip(".git")
+
+        if remote_base != url_base:
+            return (
+                "skipped",
+                name,
+                f"Skipping {name}: Directory exists but has different remote URL",
+            )
+
+        # Repository exists and has the correct remote, update it
+        pushed_at = repo.get("pushedAt") if fresh_listing else None
+        updated, message = await update_repository(repo_path, pushed_at)
+        return ("updated" if updated else "failed"), name, message
+
+    # Directory doesn't exist, clone the repository
+    visibility = "private" if repo.get("isPrivate") else "public"
+    try:
+        # Partial clone with all branches: history is fetched, but file
+        # contents only for what gets checked out (the rest on demand)
+        await _run_git("clone", "--filter=blob:none", url, repo_path)
+        return "new", name, f"Cloned {name} ({visibility})"
     except subprocess.CalledProcessError as e:
-        # Handle the error message correctly based on whether it's bytes or string
         error_msg = e.stderr if isinstance(e.stderr, str) else e.stderr.decode().strip()
-        print_error(f"Failed to update {os.path.basename(repo_path)}: {error_msg}")
-        return False
+        return "failed", name, f"Failed to clone {name}: {error_msg}"
+
+
+async def _process_repos(repos, working_dir, use_ssh, jobs, fresh_listing):
+    """Process repositories concurrently, yielding each result as it finishes.
+
+    At most `jobs` repositories have git commands running at once.
+    """
+    semaphore = asyncio.Semaphore(max(1, jobs))
 
+    async def bounded(repo):
+        async with semaphore:
+            return await _process_one_repo(repo, working_dir, use_ssh, fresh_listing)
 
-def clone_or_update_repos(repos, output_dir=None, use_ssh=True):
-    """Clone or update repositories."""
-    if output_dir:
-        os.makedirs(output_dir, exist_ok=True)
-        os.chdir(output_dir)
+    for next_result in asyncio.as_completed([bounded(repo) for repo in repos]):
+        yield await next_result
 
-    working_dir = os.getcwd()
-    new_repos = 0
-    updated_repos = 0
-    failed_repos = 0
-    skipped_repos = 0
+
+def clone_or_update_repos(
+    repos, output_dir=None, use_ssh=True, jobs=DEFAULT_JOBS, fresh_listing=False
+):
+    """Clone or update repositories, running up to `jobs` git operations at once.
+
+    `fresh_listing` tells that `repos` was just fetched from GitHub rather
+    than from the cache, see `_process_one_repo`.
+    """
+    # Every git call gets an absolute path, the process cwd is never changed
+    working_dir = os.path.abspath(output_dir or os.getcwd())
+    os.makedirs(working_dir, exist_ok=True)
+
+    printers = {
+        "new": print_success,
+        "updated": print_success,
+        "failed": print_error,
+        "skipped": print_warning,
+    }
+    counts = dict.fromkeys(printers, 0)
 
     print_header("Starting Repository Operations")
 
-    for repo in repos:
-        name = repo["name"]
-        # Choose between SSH and HTTPS URL
-        url = repo["sshUrl"] if use_ssh else repo["url"]
-        repo_path = os.path.join(working_dir, name)
-
-        if os.path.exists(repo_path):
-            if is_git_repository(repo_path):
-                remote_url = get_repo_remote_url(repo_path)
-
-                # Check if the remote URL matches (ignoring .git suffix variations)
-                remote_base = remote_url.rstrip(".git") if remote_url else ""
-                url_base = url.rstrip(".git")
-
-                if remote_base == url_base:
-                    # Repository exists and has the correct remote, update it
-                    if update_repository(repo_path):
-                        updated_repos += 1
-                    else:
-                        failed_repos += 1
-                else:
-                    print_warning(
-                        f"Skipping {name}: Directory exists but has different remote URL"
-                    )
-                    skipped_repos += 1
-            else:
-                print_warning(
-                    f"Skipping {name}: Directory exists but is not a git repository"
-                )
-                skipped_repos += 1
-        else:
-            # Directory doesn't exist, clone the repository
-            # print_info(f"Cloning: {name} ({repo['visibility']})")
-            visibility = "private" if repo.get("isPrivate") else "public"
-            print_info(f"Cloning: {name} ({visibility})")
-
-            try:
-                # Simple clone with all branches
-                subprocess.run(
-                    ["git", "clone", url, name],
-                    check=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                )
-                print_success(f"Cloned {name}")
-                new_repos += 1
-            except subprocess.CalledProcessError as e:
-                error_msg = (
-                    e.stderr if isinstance(e.stderr, str) else e.stderr.decode().strip()
-                )
-                print_error(f"Failed to clone {name}: {error_msg}")
-                failed_repos += 1
+    # Clones and fetches are network-bound and independent, so one event
+    # loop overlaps their git subprocesses without any threads
+    async def run():
+        async for status, _, message in _process_repos(
+            repos, working_dir, use_ssh, jobs, fresh_listing
+        ):
+            counts[status] += 1
+            printers[status](message)
+
+    asyncio.run(run())
 
     print_header("Operation Summary")
-    print_success(f"New repositories cloned:     {new_repos}")
-    print_success(f"Existing repositories updated: {updated_repos}")
-    print_error(f"Failed operations:            {failed_repos}")
-    print_warning(f"Skipped repositories:         {skipped_repos}")
+    print_success(f"New repositories cloned:     {counts['new']}")
+    print_success(f"Existing repositories updated: {counts['updated']}")
+    print_error(f"Failed operations:            {counts['failed']}")
+    print_warning(f"Skipped repositories:         {counts['skipped']}")
 
 
 def is_in_master_repository():
@@ -275,40 +488,83 @@ def is_in_master_repository():
 
     This checks if we're in a directory that contains multiple git repositories.
     """
-    current_dir = os.getcwd()
-    subdirs = [f for f in os.listdir(current_dir) if os.path.isdir(f)]
-    git_repos = [d for d in subdirs if is_git_repository(os.path.join(current_dir, d))]
-
     # If there are multiple git repositories in the current directory,
-    # it's likely we're in a master repository
-    return len(git_repos) > 1
+    # it's likely we're in a master repository. scandir reports entry types
+    # without a stat per entry, and the scan stops at the second repository.
+    count = 0
+    with os.scandir(".") as entries:
+        for entry in entries:
+            if entry.is_dir() and is_git_repository(entry.path):
+                count += 1
+                if count > 1:
+                    return True
+    return False
 
 
 def get_input_with_default(prompt, default):
     """Get user input with a default value if the user just presses Enter."""
     formatted_prompt = f"{Colors.BLUE}{prompt}{Colors.ENDC}"
+    # Everything printed so far has to be visible before the prompt
+    console.flush()
     response = input(formatted_prompt).strip()
     return response if response else default
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Clone or update all repositories of a GitHub organization."
+    )
+    parser.add_argument("organization", help="GitHub organization to fetch")
+    parser.add_argument(
+        "output_dir",
+        nargs="?",
+        default=None,
+        help="Directory to clone into (default: current directory)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Number of repositories to clone/update in parallel (default: {DEFAULT_JOBS})",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=int,
+        default=DEFAULT_CACHE_TTL,
+        help=f"Seconds to reuse the cached repository list (default: {DEFAULT_CACHE_TTL})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the cached repository list and fetch it again",
+    )
+    return parser.parse_args()
+
+
 def main():
     if len(sys.argv) < 2:
         print_header("GitHub Repository Manager")
-        print_error("Usage: fetch_github_repos.py <organization> [output_directory]")
+        print_error(
+            "Usage: fetch_github_repos.py <organization> [output_directory] "
+            "[--jobs N] [--cache-ttl SECONDS] [--no-cache]"
+        )
         print_info("Example: fetch_github_repos.py microsoft ./microsoft-repos")
         sys.exit(1)
 
+    args = parse_args()
+
     print_header("GitHub Repository Manager")
 
     # Enhanced tip message with spacers and green coloring
-    print(f"\n{Colors.GREEN}{Colors.BOLD}{'*' * 70}{Colors.ENDC}")
-    print(
-        f"{Colors.GREEN}{Colors.BOLD}{'*' * 5}{'':^5}TIP: PRESS ENTER TO SELECT DEFAULT OPTIONS (IN BRACKETS){'':^5}{'*' * 5}{Colors.ENDC}"
+    console.write(f"\n{Colors.GREEN}{Colors.BOLD}{'*' * 70}{Colors.ENDC}\n")
+    console.write(
+        f"{Colors.GREEN}{Colors.BOLD}{'*' * 5}{'':^5}TIP: PRESS ENTER TO SELECT DEFAULT OPTIONS (IN BRACKETS){'':^5}{'*' * 5}{Colors.ENDC}\n"
     )
-    print(f"{Colors.GREEN}{Colors.BOLD}{'*' * 70}{Colors.ENDC}\n")
+    console.write(f"{Colors.GREEN}{Colors.BOLD}{'*' * 70}{Colors.ENDC}\n\n")
 
-    org = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else None
+    org = args.organization
+    output_dir = args.output_dir
 
     # Check if we're already in what appears to be a master repository
     if output_dir is None and is_in_master_repository():
@@ -323,7 +579,7 @@ def main():
             if not output_dir:
                 output_dir = None
 
-    repos = get_all_repos(org)
+    repos, from_cache = get_all_repos(org, args.cache_ttl, use_cache=not args.no_cache)
 
     print_section(f"Repository Analysis for {org}")
     print_info(f"Found {len(repos)} repositories")
@@ -333,23 +589,14 @@ def main():
     #     repo_visibility = repo["visibility"]
     #     visibility_count[repo_visibility] = visibility_count.get(repo_visibility, 0) + 1
 
-    visibility_count = {"public": 0, "private": 0}
-    for repo in repos:
-        visibility = "private" if repo.get("isPrivate") else "public"
-        visibility_count[visibility] += 1
-
-    for repo_visibility, count in visibility_count.items():
-        if repo_visibility == "public":
-            print_info(f"🌎 Public: {count}")
-        else:
-            print_info(f"🔒 Private: {count}")
+    visibility_count = Counter(bool(repo.get("isPrivate")) for repo in repos)
+    print_info(f"🌎 Public: {visibility_count[False]}")
+    print_info(f"🔒 Private: {visibility_count[True]}")
 
     # Let user choose which visibility to clone
     print_section("Repository Visibility Selection")
     print_info("Which repositories would you like to clone or update?")
-    print(f"  1. 🌎 Public (default)")
-    print(f"  2. 🔒 Private")
-    print(f"  3. 🌐 All")
+    console.write("  1. 🌎 Public (default)\n  2. 🔒 Private\n  3. 🌐 All\n")
 
     visibility_choice = get_input_with_default("Enter your choice (1-3) [1]: ", "1")
 
@@ -371,8 +618,7 @@ def main():
     # Let user choose between SSH and HTTPS
     print_section("Connection Protocol Selection")
     print_info("How would you like to clone the repositories?")
-    print(f"  1. 🔑 SSH (default)")
-    print(f"  2. 🔗 HTTPS")
+    console.write("  1. 🔑 SSH (default)\n  2. 🔗 HTTPS\n")
 
     protocol_choice = get_input_with_default("Enter your choice (1-2) [1]: ", "1")
 
@@ -388,7 +634,13 @@ def main():
         ).lower()
 
         if choice == "y":
-            clone_or_update_repos(filtered_repos, output_dir, use_ssh)
+            clone_or_update_repos(
+                filtered_repos,
+                output_dir,
+                use_ssh,
+                args.jobs,
+                fresh_listing=not from_cache,
+            )
         else:
             # Just print the repo list if not cloning
             print_section(f"{visibility.capitalize()} Repository List")
@@ -0,0 +1,44 @@
+"""Helpers shared by analyze_openapi_changes.py and openapi_diff.py."""
+
+from typing import Any, List
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the walk below is used without it
+    orjson = None
+
+def format_path(path: List[Any]) -> str:
+    """Render a key path in DeepDiff's ``root['paths']['/bots'][0]`` notation."""
+    return "root" + "".join(f"[{key!r}]" for key in path)
+
+def _same_types(a: Any, b: Any) -> bool:
+    """Check that two equal containers also hold values of the same types throughout."""
+    # Equal dicts may order their keys differently, so values are paired by key.
+    # Leaves are checked inline, only nested containers cost a call.
+    pairs = ((v, b[k]) for k, v in a.items()) if type(a) is dict else zip(a, b)
+    for v, w in pairs:
+        if type(v) is not type(w):
+            return False
+        if type(v) in (dict, list) and not _same_types(v, w):
+            return False
+    return True
+
+def json_equal(a: Any, b: Any) -> bool:
+    """Compare two JSON values strictly, unlike == true never equals 1 nor 1 equals 1.0.
+
+    == rules out unequal values in C, the types are only checked for equal ones.
+
+    >>> json_equal({"default": 1}, {"default": True})
+    False
+    >>> json_equal([{"a": 1.5}], [{"a": 1.5}])
+    True
+    """
+    if a != b or type(a) is not type(b):
+        return False
+    if type(a) not in (dict, list):
+        return True
+    # Serializations only match when the types do, which orjson checks much
+    # faster than the walk; key order differences still need the walk
+    if orjson is not None and orjson.dumps(a) == orjson.dumps(b):
+        return True
+    return _same_types(a, b)
@@ -8,25 +8,278 @@ It provides both a summary to console and a detailed report to a file.
 
 import argparse
 import json
+import mmap
+import os
+import stat
 
-from deepdiff import DeepDiff
+try:
+    import orjson
+except ImportError:  # orjson is optional, the stdlib parser is used without it
+    orjson = None
 
+from openapi_common import format_path, json_equal
 
-def get_by_path(data, path_list):
+
+HTTP_METHODS = {"get", "put", "post", "delete", "options", "head", "patch", "trace"}
+
+
+def load_json(path):
+    """
+    Load a JSON file, parsing it with orjson straight from a memory map when
+    orjson is installed
+    """
+    with open(path, "rb") as f:
+        if orjson is None:
+            return json.load(f)
+        st = os.fstat(f.fileno())
+        # Pipes, FIFOs and empty files cannot be mapped, read those instead
+        if stat.S_ISREG(st.st_mode) and st.st_size > 0:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                pass
+            else:
+                with mm:
+                    # The view must be released before the map is closed
+                    with memoryview(mm) as view:
+                        return orjson.loads(view)
+        return orjson.loads(f.read())
+
+
+def dump_value(value):
+    """
+    Encode a value as indented JSON bytes for the detailed report
+    """
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2)
+    return json.dumps(value, indent=2).encode()
+
+
+def _parameter_key(param):
+    """
+    Identify an OpenAPI parameter by its name and location, if it has them
+    """
+    if isinstance(param, dict) and "name" in param and "in" in param:
+        return (param["name"], param["in"])
+    return None
+
+
+def _walk_parameters(old, new, path, out):
+    """
+    Compare two parameter lists, matching parameters by name and location
+
+    Removed parameters are reported at their old index, added and changed
+    ones at their new index.
+    """
+    old_keys = [_parameter_key(param) for param in old]
+    new_keys = [_parameter_key(param) for param in new]
+    if None in old_keys or None in new_keys:
+        # $ref or malformed entries, fall back to comparing by position
+        _walk_list(old, new, path, out)
+        return
+
+    old_index = {key: i for i, key in enumerate(old_keys)}
+    new_index = {key: i for i, key in enumerate(new_keys)}
+    if [key for key in old_keys if key in new_index] != [
+        key for key in new_keys if key in old_index
+    ]:
+        # Changed parameters are reported at their new index, which only
+        # points at the same parameter once removals and additions are applied
+        # if the kept ones stay in order. Reordered or duplicated ones are
+        # compared by position instead.
+        _walk_list(old, new, path, out)
+        return
+
+    for i, key in enumerate(old_keys):
+        if key not in new_index:
+            out.append(("iterable_item_removed", path + [i], old[i], None))
+    for i, key in enumerate(new_keys):
+        if key in old_index:
+            walk(old[old_index[key]], new[i], path + [i], out)
+        else:
+            out.append(("iterable_item_added", path + [i], None, new[i]))
+
+
+def _walk_list(old, new, path, out):
+    """
+    Compare two lists position by position
+    """
+    for i, (old_item, new_item) in enumerate(zip(old, new)):
+        walk(old_item, new_item, path + [i], out)
+    for i in range(len(new), len(old)):
+        out.append(("iterable_item_removed", path + [i], old[i], None))
+    for i in range(len(old), len(new)):
+        out.append(("iterable_item_added", path + [i], None, new[i]))
+
+
+def walk(old, new, path, out):
+    """
+    Recursively compare two JSON values and append their differences to out
+
+    Each difference is a (kind, path, old_value, new_value) tuple, with kinds
+    named after DeepDiff's. Equal subtrees are skipped without descending, and
+    parameter lists that keep their order are matched by name and location
+    rather than by index.
+
+    Args:
+        old: Value from the old document
+        new: Value from the new document
+        path (list): Keys leading to these values
+        out (list): Differences found so far
+
+    >>> out = []
+    >>> walk({"default": 1}, {"default": True}, [], out)
+    >>> out
+    [('type_changes', ['default'], 1, True)]
+    """
+    if json_equal(old, new):
+        return
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                out.append(("dictionary_item_removed", path + [key], old[key], None))
+        for key in new:
+            if key in old:
+                walk(old[key], new[key], path + [key], out)
+            else:
+                out.append(("dictionary_item_added", path + [key], None, new[key]))
+    elif isinstance(old, list) and isinstance(new, list):
+        if path and path[-1] == "parameters":
+            _walk_parameters(old, new, path, out)
+        else:
+            _walk_list(old, new, path, out)
+    elif type(old) is not type(new):
+        out.append(("type_changes", path, old, new))
+    else:
+        out.append(("values_changed", path, old, new))
+
+
+def index_spec(spec):
+    """
+    Index a spec's operations by (path, method) and its schemas by name
+
+    Returns:
+        tuple: (operations, schemas, rest) where rest is the spec without the
+        indexed operations and schemas, their containers left in place
+    """
+    operations = {}
+    rest_paths = {}
+    for path, item in spec.get("paths", {}).items():
+        other = {}
+        for key, value in item.items():
+            if key in HTTP_METHODS:
+                operations[(path, key)] = value
+            else:
+                other[key] = value
+        # Kept even when it only held operations, so that adding or removing
+        # the path item itself still shows up in the walk
+        rest_paths[path] = other
+
+    components = dict(spec.get("components", {}))
+    schemas = components.get("schemas", {})
+    if "schemas" in components:
+        # Same for the schemas container, the schemas are in the index
+        components["schemas"] = {}
+
+    rest = dict(spec)
+    if "paths" in spec:
+        rest["paths"] = rest_paths
+    if "components" in spec:
+        rest["components"] = components
+    return operations, schemas, rest
+
+
+def _diff_indexed(old, new, prefix, out):
+    """
+    Diff two indexes: key set differences first, then only unequal entries
     """
-    Access a nested element in data by following the path_list
+    for key in sorted(old.keys() - new.keys()):
+        out.append(("dictionary_item_removed", prefix(key), old[key], None))
+    for key in sorted(new.keys() - old.keys()):
+        out.append(("dictionary_item_added", prefix(key), None, new[key]))
+    for key in sorted(old.keys() & new.keys()):
+        walk(old[key], new[key], prefix(key), out)
+
+
+def diff_specs(old, new):
+    """
+    Diff two OpenAPI specs
+
+    Operations and schemas are looked up by (path, method) and name, so only
+    the entries that actually differ are walked. The rest of the document is
+    walked as usual.
+
+    Returns:
+        list: (kind, path, old_value, new_value) tuples, as produced by walk
+    """
+    old_ops, old_schemas, old_rest = index_spec(old)
+    new_ops, new_schemas, new_rest = index_spec(new)
+
+    changes = []
+    _diff_indexed(old_ops, new_ops, lambda key: ["paths", key[0], key[1]], changes)
+    _diff_indexed(
+        old_schemas, new_schemas, lambda name: ["components", "schemas", name], changes
+    )
+    walk(old_rest, new_rest, [], changes)
+    return changes
+
+
+def json_pointer(path):
     """
-    for key in path_list:
-        if isinstance(data, dict):
-            data = data.get(key)
-        elif isinstance(data, list) and isinstance(key, int):
-            data = data[key]
+    Render a key path as an RFC 6901 JSON Pointer, e.g. /paths/~1bots/get
+    """
+    return "".join(
+        "/" + str(key).replace("~", "~0").replace("/", "~1") for key in path
+    )
+
+
+def _patch_order(change):
+    """
+    Sort key putting shallower paths first and, at each depth, removals
+    first, with list items removed from the end backwards
+    """
+    kind, path, _, _ = change
+    if kind == "iterable_item_removed":
+        return (len(path), 0, -path[-1])
+    return (len(path), 0 if kind == "dictionary_item_removed" else 1, 0)
+
+
+def json_patch(changes):
+    """
+    Turn the differences found by diff_specs into an RFC 6902 JSON Patch
+
+    The operations are ordered so that applying them in turn reproduces the
+    new spec. Containers are added before their contents, and list indexes
+    are settled before anything inside the items changes. Differences under
+    a removed key are left out, removing the key covers them.
+
+    Args:
+        changes (list): (kind, path, old_value, new_value) tuples
+
+    Returns:
+        list: Patch operations, as dicts with op, path and value keys
+
+    >>> json_patch(diff_specs({"default": 1}, {"default": True}))
+    [{'op': 'replace', 'path': '/default', 'value': True}]
+    """
+    removed = {
+        tuple(path) for kind, path, _, _ in changes if kind == "dictionary_item_removed"
+    }
+    ops = []
+    for kind, path, _, new_val in sorted(changes, key=_patch_order):
+        if any(tuple(path[:i]) in removed for i in range(1, len(path))):
+            continue
+        if kind.endswith("_removed"):
+            ops.append({"op": "remove", "path": json_pointer(path)})
+        elif kind.endswith("_added"):
+            ops.append({"op": "add", "path": json_pointer(path), "value": new_val})
         else:
-            return None
-    return data
+            ops.append({"op": "replace", "path": json_pointer(path), "value": new_val})
+    return ops
 
 
-def compare_openapi_files(old_file, new_file, output_file=None):
+def compare_openapi_files(old_file, new_file, output_file=None, patch_file=None):
     """
     Compare two OpenAPI JSON files and output the differences
 
@@ -34,48 +287,60 @@ def compare_openapi_files(old_file, new_file, output_file=None):
         old_file (str): Path to the old OpenAPI JSON file
         new_file (str): Path to the new OpenAPI JSON file
         output_file (str, optional): Path to save detailed differences
+        patch_file (str, optional): Path to save the differences as a JSON Patch
     """
     # Load JSON files
-    with open(old_file) as f1, open(new_file) as f2:
-        old = json.load(f1)
-        new = json.load(f2)
+    old = load_json(old_file)
+    new = load_json(new_file)
 
-    # Generate diff
-    diff = DeepDiff(old, new, view="tree")
+    # Generate diff, grouped by kind of change like DeepDiff's report
+    changes = diff_specs(old, new)
+    diff = {}
+    for kind, path, old_val, new_val in changes:
+        diff.setdefault(kind, []).append((format_path(path), old_val, new_val))
 
     # Print summary to console
     if not diff:
         print("✅ No differences found in OpenAPI specs.")
     else:
         print("🔍 Differences found:\n")
-        for change_type, changes in diff.items():
+        for change_type, entries in diff.items():
             print(f"{change_type.upper()}:")
-            for change in changes:
-                try:
-                    print(f"  {change.path()} -> {getattr(change, 't2', 'REMOVED')}")
-                except Exception as e:
-                    print(f"  Error processing change: {e}")
+            removed = change_type.endswith("_removed")
+            for path_str, _, new_val in entries:
+                print(f"  {path_str} -> {'REMOVED' if removed else new_val}")
 
     # Write detailed report to file if requested
     if output_file:
-        with open(output_file, "w") as out:
+        # Written as UTF-8 bytes through a large buffer, one writelines per
+        # change, so big reports take few write calls
+        with open(output_file, "wb", buffering=1 << 20) as out:
             if not diff:
-                out.write("✅ No differences found in OpenAPI specs.\n")
+                out.write("✅ No differences found in OpenAPI specs.\n".encode())
             else:
-                out.write("🔍 Detailed Differences:\n\n")
-                for change_type, changes in diff.items():
-                    out.write(f"{change_type.upper()}:\n")
-                    for change in changes:
-                        path_str = change.path()
-                        path_parts = change.path(output_format="list")
-                        old_val = get_by_path(old, path_parts)
-                        new_val = get_by_path(new, path_parts)
-                        out.write(f"\n{path_str}:\n")
-                        out.write(f"  OLD: {json.dumps(old_val, indent=2)}\n")
-                        out.write(f"  NEW: {json.dumps(new_val, indent=2)}\n")
+                out.write("🔍 Detailed Differences:\n\n".encode())
+                for change_type, entries in diff.items():
+                    out.write(f"{change_type.upper()}:\n".encode())
+                    for path_str, old_val, new_val in entries:
+                        out.writelines(
+                            (
+                                f"\n{path_str}:\n  OLD: ".encode(),
+                                dump_value(old_val),
+                                b"\n  NEW: ",
+                                dump_value(new_val),
+                                b"\n",
+                            )
+                        )
 
         print(f"Done. Detailed diff saved to {output_file}")
 
+    if patch_file:
+        with open(patch_file, "wb") as out:
+            out.write(dump_value(json_patch(changes)))
+            out.write(b"\n")
+
+        print(f"JSON Patch saved to {patch_file}")
+
 
 def main():
     parser = argparse.ArgumentParser(description="Compare two OpenAPI JSON files")
@@ -87,9 +352,14 @@ def main():
         default="openapi_diff.txt",
         help="Path to save detailed differences (default: openapi_diff.txt)",
     )
+    parser.add_argument(
+        "--patch",
+        "-p",
+        help="Path to also save the differences as an RFC 6902 JSON Patch",
+    )
 
     args = parser.parse_args()
-    compare_openapi_files(args.old_file, args.new_file, args.output)
+    compare_openapi_files(args.old_file, args.new_file, args.output, args.patch)
 
 
 if __name__ == "__main__":